@@ -1,16 +1,31 @@
 # app.py
-import os, io, csv, json, uuid
+import os, io, csv, json, uuid, atexit, threading, textwrap, time, functools, queue, logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import pandas as pd
 import streamlit as st
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from reportlab.lib import colors
 
-# ====== Google Sheets deps ======
-import gspread
-from google.oauth2.service_account import Credentials
+log = logging.getLogger(__name__)
+
+# orjson is optional; fall back to stdlib json with matching output (compact, non-ASCII kept)
+try:
+    import orjson
+
+    def json_loads(data):
+        return orjson.loads(data)
+
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:
+    def json_loads(data):
+        return json.loads(data)
+
+    def json_dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+# reportlab and gspread/google-auth are imported inside the functions that use them,
+# so reruns that never submit (filling in the form) don't pay for loading them.
 
 # =========================
 # Streamlit Config
@@ -45,26 +60,204 @@ SHEETS = st.secrets.get("sheets", {})
 SHEET_ID = SHEETS.get("sheet_id", "")
 EVAL_TAB = SHEETS.get("eval_tab", "EvalandPT")
 CERT_TAB = SHEETS.get("cert_tab", "Certificates")
+SHEETS_BATCH_SIZE = int(SHEETS.get("batch_size", 25))      # rows buffered before a flush
+SHEETS_FLUSH_SECS = float(SHEETS.get("flush_secs", 5))     # max seconds a row waits in the buffer
 
 # Local CSV backup folder
 SAVE_DIR = "data"
-os.makedirs(SAVE_DIR, exist_ok=True)
 
 # =========================
 # Load quiz (JSON-driven)
 # =========================
-with open("questions.json", "r", encoding="utf-8") as f:
-    QUIZ = json.load(f)
+@st.cache_data(show_spinner=False)
+def load_quiz(path: str = "questions.json") -> list:
+    """Parse the post-test questions once; reruns get the cached copy."""
+    with open(path, "rb") as f:
+        return json_loads(f.read())
+
+QUIZ = load_quiz()
+ANSWER_KEY = tuple(q["answer"] for q in QUIZ)
 
 # =========================
 # Google Sheets helpers
 # =========================
 SHEETS_SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-GS_CREDS = Credentials.from_service_account_info(
-    st.secrets["gcp_service_account"],
-    scopes=SHEETS_SCOPES,
-)
-GSPREAD_CLIENT = gspread.authorize(GS_CREDS)
+
+@st.cache_resource(show_spinner=False)
+def get_gspread_client():
+    """Return a cached gspread client; the service-account key is parsed once per process."""
+    import gspread
+    from google.oauth2.service_account import Credentials
+    creds = Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"],
+        scopes=SHEETS_SCOPES,
+    )
+    return gspread.authorize(creds)
+
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+# A 5xx from values.append may arrive after the rows were written, so appends are
+# only retried when the request was rejected outright (rate limit)
+RETRY_STATUS_APPEND = frozenset({429})
+
+def retry(attempts: int = 3, backoff=lambda a: 2 ** a, statuses=RETRY_STATUS):
+    """
+    Retry a Sheets call on transient API errors (statuses, default 429 / 5xx) with
+    exponential backoff. Honors Retry-After on 429. Anything else is raised immediately.
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            from gspread.exceptions import APIError
+            for a in range(attempts):
+                try:
+                    return fn(*args, **kwargs)
+                except APIError as e:
+                    status = getattr(e.response, "status_code", None)
+                    if status not in statuses or a == attempts - 1:
+                        raise
+                    delay = backoff(a)
+                    retry_after = e.response.headers.get("Retry-After", "")
+                    if status == 429 and retry_after.isdigit():
+                        delay = max(delay, int(retry_after))
+                    time.sleep(delay)
+        return wrapper
+    return deco
+
+@st.cache_resource(show_spinner=False)
+@retry()
+def _get_ws(sheet_id: str, tab_name: str):
+    """Return a cached Worksheet handle, creating the tab once per process if missing."""
+    from gspread import WorksheetNotFound
+    sh = get_gspread_client().open_by_key(sheet_id)
+    try:
+        return sh.worksheet(tab_name)
+    except WorksheetNotFound:
+        # Provision the full known schema in one go so later appends never need a resize
+        schema = list(SHEET_SCHEMAS.get(tab_name, ()))
+        ws = sh.add_worksheet(title=tab_name, rows=1000, cols=max(len(schema), 1))
+        if schema:
+            ws.update('1:1', [schema])
+            _header_cache()[(sheet_id, tab_name)] = (schema, set(schema))
+        return ws
+
+@st.cache_resource(show_spinner=False)
+def _header_cache() -> dict:
+    """Process-wide header cache keyed by (sheet_id, tab_name); survives script reruns."""
+    return {}
+
+def _get_header(sheet_id: str, tab_name: str, ws):
+    """
+    Return the cached (header_list, header_set) for a worksheet.
+    Row 1 is read only on first use; the entry is replaced when columns are added.
+    """
+    headers = _header_cache()
+    key = (sheet_id, tab_name)
+    if key not in headers:
+        header = [h.strip() for h in (ws.row_values(1) or [])]
+        headers[key] = (header, set(header))
+    return headers[key]
+
+@st.cache_resource(show_spinner=False)
+def _sheets_buffer() -> dict:
+    """
+    Process-wide pending-row buffer shared by all sessions.
+    Rows are grouped by (sheet_id, tab_name) and written with a single append_rows call.
+    """
+    buf = {"lock": threading.Lock(), "pending": {}, "timer": None, "failures": {}}
+    # Executors refuse new work during interpreter shutdown, so the exit flush runs inline
+    atexit.register(_flush_sheets, buf, parallel=False)
+    return buf
+
+@st.cache_resource(show_spinner=False)
+def _io_pool() -> ThreadPoolExecutor:
+    """Shared worker pool for independent network writes."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="sheets-io")
+
+@retry(statuses=RETRY_STATUS_APPEND)
+def _append_rows(ws, rows: list):
+    ws.append_rows(rows, value_input_option="USER_ENTERED", insert_data_option="INSERT_ROWS")
+
+@retry()
+def _write_header(ws, header: list):
+    # col_count comes from the cached sheet properties; only grow the grid when it is too narrow
+    if len(header) > ws.col_count:
+        ws.resize(cols=len(header))
+    ws.update('1:1', [header])
+
+def _schedule_flush(buf: dict, delay: float):
+    """Start the flush timer unless one is already pending; caller holds buf["lock"]."""
+    if buf["timer"] is None:
+        buf["timer"] = threading.Timer(delay, _flush_sheets, args=(buf,))
+        buf["timer"].daemon = True
+        buf["timer"].start()
+
+def _append_buffered(buf: dict, sheet_id: str, tab_name: str, rows: list):
+    """
+    append_rows for one worksheet. A 5xx may arrive after the rows were written, so
+    those rows are not sent again; they go to data/unconfirmed_<tab>.csv for a manual
+    check instead. On any other failure the rows go back to the buffer and a retry
+    flush is scheduled with exponential backoff (capped at 5 minutes), so they reach
+    the sheet even if no one else submits.
+    """
+    from gspread.exceptions import APIError
+    try:
+        _append_rows(_get_ws(sheet_id, tab_name), rows)
+    except APIError as e:
+        if (getattr(e.response, "status_code", None) or 0) < 500:
+            _requeue_rows(buf, sheet_id, tab_name, rows, e)
+            return
+        # Rows were aligned to this header when they were buffered
+        header = _header_cache()[(sheet_id, tab_name)][0]
+        path = os.path.join(SAVE_DIR, f"unconfirmed_{tab_name}.csv")
+        for r in rows:
+            save_row_to_csv(path, dict(zip(header, r)))
+        flush_csv_sinks()
+        log.warning("Sheets append for %s failed after sending (%d rows saved to %s): %s", tab_name, len(rows), path, e)
+    except Exception as e:
+        _requeue_rows(buf, sheet_id, tab_name, rows, e)
+    else:
+        with buf["lock"]:
+            buf["failures"].pop((sheet_id, tab_name), None)
+
+def _requeue_rows(buf: dict, sheet_id: str, tab_name: str, rows: list, e: Exception):
+    """Put rows back at the front of the buffer and schedule a backed-off retry flush."""
+    with buf["lock"]:
+        buf["pending"].setdefault((sheet_id, tab_name), [])[:0] = rows
+        n = buf["failures"][(sheet_id, tab_name)] = buf["failures"].get((sheet_id, tab_name), 0) + 1
+        delay = min(SHEETS_FLUSH_SECS * 2 ** n, 300)
+        _schedule_flush(buf, delay)
+    log.warning("Sheets flush failed for %s (%d rows kept, retry in %.0fs): %s", tab_name, len(rows), delay, e)
+
+def _flush_sheets(buf: dict, parallel: bool = True):
+    """
+    Write every buffered row with one append_rows call per worksheet.
+    Evaluation and certificate tabs are independent, so their appends run concurrently
+    and the flush costs max(t_eval, t_cert) instead of the sum.
+    """
+    with buf["lock"]:
+        pending, buf["pending"] = buf["pending"], {}
+        buf["timer"] = None
+    if not parallel or len(pending) == 1:
+        for key, rows in pending.items():
+            _append_buffered(buf, *key, rows)
+        return
+    futures = [_io_pool().submit(_append_buffered, buf, *key, rows) for key, rows in pending.items()]
+    for fut in futures:
+        fut.result()
+
+def _enqueue_row(sheet_id: str, tab_name: str, row_vals: list):
+    """Buffer a row; flush immediately at SHEETS_BATCH_SIZE, otherwise after SHEETS_FLUSH_SECS."""
+    buf = _sheets_buffer()
+    with buf["lock"]:
+        rows = buf["pending"].setdefault((sheet_id, tab_name), [])
+        rows.append(row_vals)
+        full = len(rows) >= SHEETS_BATCH_SIZE
+        if not full:
+            _schedule_flush(buf, SHEETS_FLUSH_SECS)
+    if full:
+        # Callers usually run on an _io_pool worker; waiting on that same pool for the
+        # per-tab appends could starve it, so a size-triggered flush stays on this thread
+        _flush_sheets(buf, parallel=False)
 
 def sheets_append_dict(sheet_id: str, tab_name: str, row_dict: dict):
     """
@@ -72,37 +265,35 @@ def sheets_append_dict(sheet_id: str, tab_name: str, row_dict: dict):
     - Creates the worksheet if missing.
     - Adds any new columns found in row_dict (appended at the end).
     - Preserves existing header order and aligns values by header name.
+    - Worksheet handle and header are cached; rows are batched via append_rows.
     """
-    sh = GSPREAD_CLIENT.open_by_key(sheet_id)
-    try:
-        ws = sh.worksheet(tab_name)
-    except gspread.WorksheetNotFound:
-        header = list(row_dict.keys())
-        ws = sh.add_worksheet(title=tab_name, rows=1000, cols=max(len(header), 1))
-        ws.append_row(header, value_input_option="USER_ENTERED")
-
-    # Current header
-    header = ws.row_values(1) or []
-    header_set = set(h.strip() for h in header)
+    ws = _get_ws(sheet_id, tab_name)
+    header, header_set = _get_header(sheet_id, tab_name, ws)
 
     # Add new columns (found in row_dict but missing in header)
-    new_cols = [k for k in row_dict.keys() if k not in header_set]
+    new_cols = [k for k in row_dict if k not in header_set]
     if new_cols:
-        header_extended = header + new_cols
-        ws.resize(rows=ws.row_count, cols=len(header_extended))
-        ws.update('1:1', [header_extended])
-        header = header_extended
+        header = header + new_cols
+        _write_header(ws, header)
+        _header_cache()[(sheet_id, tab_name)] = (header, set(header))
 
-    # Align row values to header order
+    # Align row values to header order and hand off to the batch buffer
     row_vals = [row_dict.get(col, "") for col in header]
-    ws.append_row(row_vals, value_input_option="USER_ENTERED")
+    _enqueue_row(sheet_id, tab_name, row_vals)
+
+# Free-text fields kept in the payload snapshot; every other field already has its own column
+SNAPSHOT_KEYS = ("beneficial_topic", "topics_interest", "comments", "bias_explain", "pc_other")
+
+# Newlines (and stray CRs) become spaces so free text stays on one CSV/Sheets line
+_NL_TABLE = str.maketrans({"\n": " ", "\r": " "})
+
+def one_line(text: str) -> str:
+    return (text or "").translate(_NL_TABLE)
 
 def save_eval_to_sheets(row_enriched: dict):
-    # Normalize multi-line text and keep a payload snapshot
+    # Free text is already single-line (see one_line); keep a compact snapshot of it
     row_enriched = dict(row_enriched)
-    row_enriched["topics_interest"] = (row_enriched.get("topics_interest") or "").replace("\n", " ")
-    row_enriched["comments"]        = (row_enriched.get("comments") or "").replace("\n", " ")
-    row_enriched["payload_json"]    = json.dumps(row_enriched, ensure_ascii=False)
+    row_enriched["payload_json"] = json_dumps({k: row_enriched.get(k, "") for k in SNAPSHOT_KEYS})
     sheets_append_dict(SHEET_ID, EVAL_TAB, row_enriched)
 
 def save_cert_to_sheets(cert_row: dict):
@@ -113,18 +304,50 @@ def save_cert_to_sheets(cert_row: dict):
 # =========================
 # Other helpers
 # =========================
-def make_certificate_pdf(full_name: str, email: str, score_pct: float, cert_id: str) -> bytes:
-    """Generate a landscape Letter certificate PDF and return bytes."""
+BG_PATH = "assets/cert_bg.png"
+PAGESIZE = (792.0, 612.0)  # reportlab landscape(letter), in points
+
+@st.cache_resource(show_spinner=False)
+def _load_background(path: str):
+    """
+    Decode the certificate background once per process.
+    Returns (ImageReader, (x, y, w, h)) centered on the page with aspect ratio kept, or None.
+    """
+    if not os.path.exists(path):
+        return None
+    from reportlab.lib.utils import ImageReader
+    try:
+        reader = ImageReader(path)
+        img_w, img_h = reader.getSize()
+    except Exception as e:
+        log.warning("Background image found but could not be loaded: %s", e)
+        return None
+    page_w, page_h = PAGESIZE
+    scale = min(page_w / img_w, page_h / img_h)
+    w, h = img_w * scale, img_h * scale
+    return reader, ((page_w - w) / 2, (page_h - h) / 2, w, h)
+
+def make_certificate_pdf(full_name: str, email: str, score_pct: float, cert_id: str, issued_on: str) -> io.BytesIO:
+    """Generate a landscape Letter certificate PDF and return the rewound buffer."""
+    from reportlab import rl_config
+    from reportlab.pdfgen import canvas
+    from reportlab.lib import colors
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    # The background is re-embedded in every PDF; skipping the ASCII85 layer on its
+    # Flate stream cuts that embed cost by more than half (binary PDFs need no 7-bit encoding)
+    rl_config.useA85 = 0
+
     buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=landscape(letter))
-    width, height = landscape(letter)
+    c = canvas.Canvas(buffer, pagesize=PAGESIZE, pageCompression=1, invariant=1)
+    width, height = PAGESIZE
 
     # Optional background image at assets/cert_bg.png
-    bg_path = "assets/cert_bg.png"
-    if os.path.exists(bg_path):
+    bg = _load_background(BG_PATH)
+    if bg is not None:
         try:
-            c.drawImage(ImageReader(bg_path), 0, 0, width=width, height=height,
-                        preserveAspectRatio=True, anchor="c")
+            reader, (bx, by, bw, bh) = bg
+            c.drawImage(reader, bx, by, width=bw, height=bh)
         except Exception as e:
             st.warning(f"Background image found but could not be drawn: {e}")
 
@@ -137,37 +360,149 @@ def make_certificate_pdf(full_name: str, email: str, score_pct: float, cert_id:
     c.setFont("Helvetica-Bold", 26)
     c.drawCentredString(width/2, height/2 + 55, full_name)
 
-    # Body
-    c.setFont("Helvetica", 13)
-    body = (
+    # Body: one text object, each line centred by its own width
+    body_text = (
         f"has successfully completed the Philippine Nurses Association of New York, Inc. webinar "
         f"“{COURSE_TITLE}” on {COURSE_DATE} and passed the post-test."
         f"Credits awarded: {CREDIT_HOURS} contact hour(s)."
     )
-    import textwrap
+    body_lines = textwrap.wrap(body_text, 100)
+    body = c.beginText()
+    body.setFont("Helvetica", 13)
     y = height/2 + 18
-    for line in textwrap.wrap(body, 100):
-        c.drawCentredString(width/2, y, line)
+    for line in body_lines:
+        body.setTextOrigin((width - stringWidth(line, "Helvetica", 13)) / 2, y)
+        body.textOut(line)
         y -= 16
+    c.drawText(body)
 
     # Cert ID & issued date
-    issued_on = datetime.now().strftime("%Y-%m-%d %H:%M")
     c.setFont("Helvetica", 9)
     c.drawRightString(width - 60, 72, f"Certificate ID: {cert_id}")
     c.drawRightString(width - 60, 58, f"Issued on: {issued_on}")
 
     c.showPage()
     c.save()
-    return buffer.getvalue()
+    buffer.seek(0)
+    return buffer
+
+@st.cache_resource(show_spinner=False)
+def _csv_sinks() -> dict:
+    """Process-wide registry of open CSV backups, keyed by path."""
+    return {}
+
+def _csv_sink(path: str) -> dict:
+    """
+    Open the CSV backup once per process in block-buffered binary append mode.
+    Column order is frozen from the existing header (or the first row written),
+    so later rows can never drift out of alignment with it.
+    """
+    sinks = _csv_sinks()
+    if path not in sinks:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fields = None
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                fields = tuple(next(csv.reader(f)))
+        sinks[path] = {"lock": threading.Lock(), "fh": open(path, "ab", buffering=1 << 16), "fields": fields}
+    return sinks[path]
+
+def flush_csv_sinks():
+    """Push buffered CSV rows to disk; called when the background queue goes idle and at exit."""
+    for sink in list(_csv_sinks().values()):
+        with sink["lock"]:
+            sink["fh"].flush()
 
 def save_row_to_csv(path: str, row: dict):
-    """Append a row to CSV for local backup."""
-    new = not os.path.exists(path)
-    with open(path, "a", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=row.keys())
-        if new:
-            w.writeheader()
-        w.writerow(row)
+    """Append a row to CSV for local backup (buffered; see flush_csv_sinks)."""
+    sink = _csv_sink(path)
+    with sink["lock"]:
+        out = io.StringIO()
+        w = csv.writer(out)
+        if sink["fields"] is None:
+            sink["fields"] = tuple(row.keys())
+            w.writerow(sink["fields"])
+        w.writerow([row.get(k, "") for k in sink["fields"]])
+        sink["fh"].write(out.getvalue().encode("utf-8"))
+
+def _drain(q: queue.Queue):
+    """Run queued (fn, args) jobs one at a time; failures are logged, never raised."""
+    while True:
+        fn, args = q.get()
+        try:
+            fn(*args)
+        except Exception:
+            log.exception("Background job %s failed", fn.__name__)
+        finally:
+            q.task_done()
+        # Bursts stay in the write buffer; flush once the queue is idle
+        if q.empty():
+            flush_csv_sinks()
+
+def _drain_remaining(q: queue.Queue):
+    """atexit hook: finish whatever the daemon worker had not picked up yet."""
+    while True:
+        try:
+            fn, args = q.get_nowait()
+        except queue.Empty:
+            flush_csv_sinks()
+            return
+        try:
+            fn(*args)
+        except Exception:
+            log.exception("Background job %s failed at exit", fn.__name__)
+
+@st.cache_resource(show_spinner=False)
+def _background_queue() -> queue.Queue:
+    """Process-wide fire-and-forget queue for non-critical writes (local CSV backup)."""
+    q = queue.Queue()
+    threading.Thread(target=_drain, args=(q,), daemon=True, name="bg-writer").start()
+    atexit.register(_drain_remaining, q)
+    return q
+
+# =========================
+# Evaluation constants
+# =========================
+LIKERT = ("Strongly agree", "Agree", "Undecided", "Disagree", "Strongly disagree")
+LIKERT_MAP = {"Strongly agree":5, "Agree":4, "Undecided":3, "Disagree":2, "Strongly disagree":1}
+
+def BOOL(b) -> str:
+    return "Yes" if b else "No"
+
+SPEAKER_COLS = (
+    ("speaker_yap",        "Wilfredo Yap Jr., DNP, RN, AMB-BC, CENP, NEA-BC"),
+    ("speaker_sagar",      "Priscilla L. Sagar, EdD, RN, ACNS-BC, CTN-A, FNYAM, FTNSS, FAAN"),
+    ("speaker_velasquez",  "Joana Velasquez, PhD, RN, CNOR"),
+    ("speaker_pastoral",   "Gizelle Pastoral, MS, RN, NI-BC"),
+    ("speaker_santarina",  "Maia Santarina, BSN, RN"),
+    ("speaker_planillo",   "Jose Mapalad M. Planillo, RN, MSN, MBA, HCM, CCRN, CAPA, CPE"),
+    ("speaker_florendo",   "Camille Dolly Marie D. Florendo, BSN, RN"),
+    ("speaker_jomoc",      "Cristy Ellen Jomoc, MN, RN, MEDSURG-BC, PCCN"),
+    ("speaker_oliverio",   "Ebeneza P. Oliverio, MSN, RN"),
+    ("speaker_temprosa",   "Clifford Robin Temprosa Li, KOR, BS"),
+    ("speaker_bedona",     "Mariel Joy Bedona, BSN, RN"),
+    ("speaker_agcon",      "Aubrey May Agcon, MSN, RN"),
+)
+
+# Canonical column order used when a worksheet has to be created
+EVAL_SCHEMA = (
+    "timestamp", "full_name", "email",
+    "role", "job_title", "institution_name", "attendance",
+    "location_city", "location_state", "location_country", "member_status", "contact_opt_in",
+    "ev_org", "ev_ad", "ev_rel", "ev_virt", "ev_obj", "lo_met",
+    "ev_org_num", "ev_ad_num", "ev_rel_num", "ev_virt_num", "ev_obj_num",
+    "overall_prog", "overall_rec", "overall_zoom",
+    "beneficial_topic", "topics_interest", "comments",
+    "quiz_score", "quiz_total", "quiz_pct", "quiz_passed",
+    "score_pct", "passed", "cert_id",
+    *(col for col, _ in SPEAKER_COLS),
+    "improve_knowledge", "improve_skills", "improve_competence", "improve_performance", "improve_outcomes",
+    "fair_balanced", "commercial_support", "commercial_bias", "bias_explain",
+    "pc_values", "pc_joy", "pc_health", "pc_other",
+    "payload_json",
+)
+CERT_SCHEMA = ("cert_id", "name", "email", "course_title", "course_date", "credit_hours", "created_at")
+SHEET_SCHEMAS = {EVAL_TAB: EVAL_SCHEMA, CERT_TAB: CERT_SCHEMA}
 
 # =========================
 # UI
@@ -179,293 +514,287 @@ st.caption("Complete the evaluation and post-test. On passing (≥ 75%), your ce
 with st.form("info"):
     c1, c2 = st.columns(2)
     with c1:
-        full_name = st.text_input("Full Name *")
+        st.text_input("Full Name *", key="full_name")
     with c2:
-        email = st.text_input("Email *")
+        st.text_input("Email *", key="email")
 
     cA, cB = st.columns(2)
     with cA:
-        job_title = st.text_input("Role / Job Title")  # NEW
+        st.text_input("Role / Job Title", key="job_title")
     with cB:
-        institution_name = st.text_input("Institution / Facility Name")  # NEW
+        st.text_input("Institution / Facility Name", key="institution_name")
 
     c3, c4, c5 = st.columns(3)
     with c3:
-        location_city = st.text_input("City")
+        st.text_input("City", key="location_city")
     with c4:
-        location_state = st.text_input("State/Province")
+        st.text_input("State/Province", key="location_state")
     with c5:
-        location_country = st.text_input("Country")
+        st.text_input("Country", key="location_country")
 
     c6, c7 = st.columns(2)
     with c6:
-        role = st.selectbox("Credentials", ["RN", "APRN", "NP", "PA", "Student", "Other"])
+        st.selectbox("Credentials", ["RN", "APRN", "NP", "PA", "Student", "Other"], key="role")
     with c7:
-        member_status = st.selectbox("PNANY Member Status", ["Member", "Non-member", "Inactive"])
+        st.selectbox("PNANY Member Status", ["Member", "Non-member", "Inactive"], key="member_status")
 
-    contact_opt_in = st.checkbox(
-        "I’d like to be contacted about future PNANY professional development, membership, and other activities."
+    st.checkbox(
+        "I’d like to be contacted about future PNANY professional development, membership, and other activities.",
+        key="contact_opt_in",
     )
 
-    attendance = st.checkbox(
+    st.checkbox(
         "I certify that I attended and completed the Lead to INSPIRE Fall Conference: "
-        "Gabay at Galing: Empowering the New Generation of Nurse Leaders, held online on October 18, 2025."
+        "Gabay at Galing: Empowering the New Generation of Nurse Leaders, held online on October 18, 2025.",
+        key="attendance",
     )
     cont = st.form_submit_button("Continue ➡️")
 
+# Every widget is keyed by its output column; values are read back from session_state
+S = st.session_state
+
 if cont:
-    if not full_name or not email or not attendance:
+    if not S.full_name or not S.email or not S.attendance:
         st.error("Please complete name, email, and confirm attendance.")
     else:
         st.session_state["participant_ok"] = True
         st.success("Thanks! Continue below.")
 
 # ---- 2) Evaluation ----
-if st.session_state.get("participant_ok"):
-    st.subheader("📊 Course Evaluation")
+# Nothing below renders until participant info has been accepted
+if not st.session_state.get("participant_ok"):
+    st.stop()
 
-    LIKERT = ["Strongly agree", "Agree", "Undecided", "Disagree", "Strongly disagree"]
-    LIKERT_MAP = {"Strongly agree":5, "Agree":4, "Undecided":3, "Disagree":2, "Strongly disagree":1}
-    BOOL = lambda b: "Yes" if bool(b) else "No"
+# One form for evaluation + post-test: widget changes don't rerun the script until submit
+with st.form("evaluation"):
+    st.subheader("📊 Course Evaluation")
 
-    def L(label):
-        return st.select_slider(label, options=LIKERT, value="Strongly agree")
+    def L(label, key):
+        st.select_slider(label, options=LIKERT, value="Strongly agree", key=key)
 
-    ev_org = L("Was well organized")
-    ev_ad  = L("Was consistent with flyer advertising event")
-    ev_rel = L("Was relevant to learning outcomes of presentation")
-    ev_virt= L("Effectively used virtual teaching method")
-    ev_obj = L("Enabled me to meet my personal objectives")
+    L("Was well organized", "ev_org")
+    L("Was consistent with flyer advertising event", "ev_ad")
+    L("Was relevant to learning outcomes of presentation", "ev_rel")
+    L("Effectively used virtual teaching method", "ev_virt")
+    L("Enabled me to meet my personal objectives", "ev_obj")
 
     st.markdown("**Overall Satisfaction**")
-    overall_prog = st.selectbox(
+    st.selectbox(
         "Overall satisfaction of the program",
-        ["Excellent", "Good", "Undecided", "Unlikely", "Very Unlikely"], index=0
+        ["Excellent", "Good", "Undecided", "Unlikely", "Very Unlikely"], index=0, key="overall_prog"
     )
-    overall_rec  = st.selectbox(
+    st.selectbox(
         "Likelihood to recommend to colleagues",
-        ["Excellent", "Good", "Undecided", "Unlikely", "Very Unlikely"], index=0
+        ["Excellent", "Good", "Undecided", "Unlikely", "Very Unlikely"], index=0, key="overall_rec"
     )
-    overall_zoom = st.selectbox(
+    st.selectbox(
         "Satisfaction with method of presentation (ZOOM)",
-        ["Excellent", "Good", "Undecided", "Unlikely", "Very Unlikely"], index=0
+        ["Excellent", "Good", "Undecided", "Unlikely", "Very Unlikely"], index=0, key="overall_zoom"
     )
 
-    lo_met = L("Were Activity Learning Outcomes Met? At least 80% of attendees will pass a post-test with a score of 75% or higher.")
+    L("Were Activity Learning Outcomes Met? At least 80% of attendees will pass a post-test with a score of 75% or higher.", "lo_met")
 
     st.markdown("**Speaker teaching effectiveness** *(1 = Poor, 5 = Excellent)*")
-    speaker_fields = [
-        ("q4_speaker_yap",        "Wilfredo Yap Jr., DNP, RN, AMB-BC, CENP, NEA-BC"),
-        ("q4_speaker_sagar",      "Priscilla L. Sagar, EdD, RN, ACNS-BC, CTN-A, FNYAM, FTNSS, FAAN"),
-        ("q4_speaker_velasquez",  "Joana Velasquez, PhD, RN, CNOR"),
-        ("q4_speaker_pastoral",   "Gizelle Pastoral, MS, RN, NI-BC"),
-        ("q4_speaker_santarina",  "Maia Santarina, BSN, RN"),
-        ("q4_speaker_planillo",   "Jose Mapalad M. Planillo, RN, MSN, MBA, HCM, CCRN, CAPA, CPE"),
-        ("q4_speaker_florendo",   "Camille Dolly Marie D. Florendo, BSN, RN"),
-        ("q4_speaker_jomoc",      "Cristy Ellen Jomoc, MN, RN, MEDSURG-BC, PCCN"),
-        ("q4_speaker_oliverio",   "Ebeneza P. Oliverio, MSN, RN"),
-        ("q4_speaker_temprosa",   "Clifford Robin Temprosa Li, KOR, BS"),
-        ("q4_speaker_bedona",     "Mariel Joy Bedona, BSN, RN"),
-        ("q4_speaker_agcon",      "Aubrey May Agcon, MSN, RN"),
-    ]
-    speaker_ratings = {}
-    for key, label in speaker_fields:
-        speaker_ratings[key] = st.select_slider(label, options=["1", "2", "3", "4", "5"], value="5")
+    speaker_tbl = st.data_editor(
+        pd.DataFrame({"Speaker": [label for _, label in SPEAKER_COLS], "Rating": ["5"] * len(SPEAKER_COLS)}),
+        column_config={
+            "Speaker": st.column_config.TextColumn(disabled=True, width="large"),
+            "Rating": st.column_config.SelectboxColumn(options=["1", "2", "3", "4", "5"], required=True),
+        },
+        hide_index=True,
+        width="stretch",
+        key="speakers_tbl",
+    )
+    speaker_ratings = dict(zip((col for col, _ in SPEAKER_COLS), speaker_tbl["Rating"]))
 
     st.markdown("**This activity will assist in improvement of (check all that apply):**")
-    imp_knowledge   = st.checkbox("Knowledge")
-    imp_skills      = st.checkbox("Skills")
-    imp_competence  = st.checkbox("Competence")
-    imp_performance = st.checkbox("Performance")
-    imp_outcomes    = st.checkbox("Patient Outcomes")
+    st.checkbox("Knowledge",        key="improve_knowledge")
+    st.checkbox("Skills",           key="improve_skills")
+    st.checkbox("Competence",       key="improve_competence")
+    st.checkbox("Performance",      key="improve_performance")
+    st.checkbox("Patient Outcomes", key="improve_outcomes")
 
-    fair_balanced       = st.radio("Do you feel this content was fair and balanced?", ["Yes", "No"], index=0)
-    commercial_support  = st.radio("Did this presentation have any commercial support?", ["Yes", "No"], index=1)
-    commercial_bias     = st.radio("If yes, did the speaker demonstrate any commercial bias?", ["N/A", "Yes", "No"], index=0)
-    bias_explain        = st.text_input("If yes, explain", "")
+    st.radio("Do you feel this content was fair and balanced?", ["Yes", "No"], index=0, key="fair_balanced")
+    st.radio("Did this presentation have any commercial support?", ["Yes", "No"], index=1, key="commercial_support")
+    st.radio("If yes, did the speaker demonstrate any commercial bias?", ["N/A", "Yes", "No"], index=0, key="commercial_bias")
+    st.text_input("If yes, explain", "", key="bias_explain")
 
     st.markdown("**Practice change**")
-    pc_values   = st.checkbox("Reflect on and adopt values that elevate nurses to heroes")
-    pc_joy      = st.checkbox("Employ ways to instill and sustain the joy of practice in nursing and healthcare")
-    pc_health   = st.checkbox("Utilize ways to address healthcare issues of Filipino Americans in NY")
-    pc_other    = st.text_input("Other (please specify)", "")
-    beneficial_topic = st.text_input("Which program topic was most beneficial to you?")
+    st.checkbox("Reflect on and adopt values that elevate nurses to heroes", key="pc_values")
+    st.checkbox("Employ ways to instill and sustain the joy of practice in nursing and healthcare", key="pc_joy")
+    st.checkbox("Utilize ways to address healthcare issues of Filipino Americans in NY", key="pc_health")
+    st.text_input("Other (please specify)", "", key="pc_other")
+    st.text_input("Which program topic was most beneficial to you?", key="beneficial_topic")
 
-    topics_interest = st.text_area("What topics of interest would you like us to provide?")
-    comments        = st.text_area("Comments")
+    st.text_area("What topics of interest would you like us to provide?", key="topics_interest")
+    st.text_area("Comments", key="comments")
 
     # ---- 3) Post-Test ----
     st.subheader(f"📝 Post-Test ({len(QUIZ)} items)")
-    answers = {}
     for i, q in enumerate(QUIZ, start=1):
         st.markdown(f"**Q{i}. {q['question']}**")
-        answers[str(i)] = st.radio(
-            f"Answer Q{i}", q["options"], index=None, key=f"q{i}", label_visibility="collapsed"
-        )
+        st.radio(f"Answer Q{i}", q["options"], index=None, key=f"q{i}", label_visibility="collapsed")
         st.divider()
 
-    # ---- Submit ----
-    if st.button("Submit Evaluation & Generate Certificate"):
-        # Validate quiz completion
-        if any(answers[str(i)] is None for i in range(1, len(QUIZ) + 1)):
-            st.error("Please answer all post-test questions.")
-            st.stop()
-
-        # Compute score
-        correct = sum(1 for i, q in enumerate(QUIZ, start=1) if answers[str(i)] == q["answer"])
-        total = len(QUIZ)
-        score_pct = 100 * correct / total
-        passed = score_pct >= PASSING_SCORE
-
-        # Big pass/fail badge
-        if passed:
-            st.markdown(
-                f"""
-                <div style="padding:16px;border-radius:12px;background:#ECFDF5;border:1px solid #34D399;">
-                  <div style="font-size:28px;line-height:1.2;margin-bottom:6px;">✅ <strong>{score_pct:.0f}%</strong></div>
-                  <div style="font-size:16px;">Your score: <strong>{correct}/{total}</strong> — Passing score is {PASSING_SCORE}%</div>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-        else:
-            st.markdown(
-                f"""
-                <div style="padding:16px;border-radius:12px;background:#FEF2F2;border:1px solid #F87171;">
-                  <div style="font-size:28px;line-height:1.2;margin-bottom:6px;">❌ <strong>{score_pct:.0f}%</strong></div>
-                  <div style="font-size:16px;">Your score: <strong>{correct}/{total}</strong> — Passing score is {PASSING_SCORE}%</div>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-
-        cert_id = str(uuid.uuid4())
-
-        # Build row for CSV + Sheets (header-aware writer will align)
-        row = {
-            "timestamp": datetime.now().isoformat(timespec="seconds"),
-            "full_name": full_name,
-            "email": email,
-
-            # Attendee demographics
-            "role": role,                           # credentials (RN/APRN/etc.)
-            "job_title": job_title,                 # NEW
-            "institution_name": institution_name,   # NEW
-            "attendance": "Yes" if attendance else "No",
-            "location_city": location_city,
-            "location_state": location_state,
-            "location_country": location_country,
-            "member_status": member_status,
-            "contact_opt_in": BOOL(contact_opt_in),
-
-            # Evaluation (Likert - text)
-            "ev_org": ev_org,
-            "ev_ad": ev_ad,
-            "ev_rel": ev_rel,
-            "ev_virt": ev_virt,
-            "ev_obj": ev_obj,
-            "lo_met": lo_met,
-
-            # Evaluation numeric mirrors (for averages)
-            "ev_org_num":  LIKERT_MAP.get(ev_org, ""),
-            "ev_ad_num":   LIKERT_MAP.get(ev_ad, ""),
-            "ev_rel_num":  LIKERT_MAP.get(ev_rel, ""),
-            "ev_virt_num": LIKERT_MAP.get(ev_virt, ""),
-            "ev_obj_num":  LIKERT_MAP.get(ev_obj, ""),
-
-            # Overall ratings
-            "overall_prog": overall_prog,
-            "overall_rec":  overall_rec,
-            "overall_zoom": overall_zoom,
-
-            # Free text
-            "beneficial_topic": beneficial_topic,
-            "topics_interest": topics_interest.replace("\n", " "),
-            "comments": comments.replace("\n", " "),
-
-            # Quiz summary
-            "quiz_score": correct,
-            "quiz_total": total,
-            "quiz_pct": f"{score_pct:.0f}",
-            "quiz_passed": BOOL(passed),
-
-            # Pass/Cert linkage
-            "score_pct": f"{score_pct:.0f}",
-            "passed": passed,
-            "cert_id": cert_id,
-        }
-
-        # Speaker ratings (1..5)
-        row.update({
-            "speaker_yap":        speaker_ratings.get("q4_speaker_yap", ""),
-            "speaker_sagar":      speaker_ratings.get("q4_speaker_sagar", ""),
-            "speaker_velasquez":  speaker_ratings.get("q4_speaker_velasquez", ""),
-            "speaker_pastoral":   speaker_ratings.get("q4_speaker_pastoral", ""),
-            "speaker_santarina":  speaker_ratings.get("q4_speaker_santarina", ""),
-            "speaker_planillo":   speaker_ratings.get("q4_speaker_planillo", ""),
-            "speaker_florendo":   speaker_ratings.get("q4_speaker_florendo", ""),
-            "speaker_jomoc":      speaker_ratings.get("q4_speaker_jomoc", ""),
-            "speaker_oliverio":   speaker_ratings.get("q4_speaker_oliverio", ""),
-            "speaker_temprosa":   speaker_ratings.get("q4_speaker_temprosa", ""),
-            "speaker_bedona":     speaker_ratings.get("q4_speaker_bedona", ""),
-            "speaker_agcon":      speaker_ratings.get("q4_speaker_agcon", ""),
-        })
-
-        # Improvement + bias + practice change
-        row.update({
-            "improve_knowledge":   BOOL(imp_knowledge),
-            "improve_skills":      BOOL(imp_skills),
-            "improve_competence":  BOOL(imp_competence),
-            "improve_performance": BOOL(imp_performance),
-            "improve_outcomes":    BOOL(imp_outcomes),
-
-            "fair_balanced":       fair_balanced,
-            "commercial_support":  commercial_support,
-            "commercial_bias":     commercial_bias,
-            "bias_explain":        bias_explain,
-
-            "pc_values": BOOL(pc_values),
-            "pc_joy":    BOOL(pc_joy),
-            "pc_health": BOOL(pc_health),
-            "pc_other":  pc_other,
-        })
-
-        # CSV backup (optional)
-        save_row_to_csv(os.path.join(SAVE_DIR, "submissions.csv"), row)
-
-        # Save to Google Sheets (evaluations)
-        try:
-            save_eval_to_sheets(row)
-            st.success("Saved to Google Sheets ✅")
-        except Exception as e:
-            st.error(f"Could not save to Google Sheets (evaluations): {e}")
-
-        # If not passed, stop here
-        if not passed:
-            st.error("You did not reach the passing score. You may review content and retake the post-test.")
-            st.stop()
+    submitted = st.form_submit_button("Submit Evaluation & Generate Certificate")
+
+# ---- Submit ----
+if submitted:
+    # Validate quiz completion
+    answers = [S[f"q{i}"] for i in range(1, len(QUIZ) + 1)]
+    if None in answers:
+        st.error("Please answer all post-test questions.")
+        st.stop()
+
+    # Compute score
+    correct = sum(a == k for a, k in zip(answers, ANSWER_KEY))
+    total = len(ANSWER_KEY)
+    score_pct = 100 * correct / total
+    passed = score_pct >= PASSING_SCORE
+
+    # Big pass/fail badge
+    if passed:
+        st.markdown(
+            f"""
+            <div style="padding:16px;border-radius:12px;background:#ECFDF5;border:1px solid #34D399;">
+              <div style="font-size:28px;line-height:1.2;margin-bottom:6px;">✅ <strong>{score_pct:.0f}%</strong></div>
+              <div style="font-size:16px;">Your score: <strong>{correct}/{total}</strong> — Passing score is {PASSING_SCORE}%</div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+    else:
+        st.markdown(
+            f"""
+            <div style="padding:16px;border-radius:12px;background:#FEF2F2;border:1px solid #F87171;">
+              <div style="font-size:28px;line-height:1.2;margin-bottom:6px;">❌ <strong>{score_pct:.0f}%</strong></div>
+              <div style="font-size:16px;">Your score: <strong>{correct}/{total}</strong> — Passing score is {PASSING_SCORE}%</div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
 
-        # Passed → certificate
-        pdf_bytes = make_certificate_pdf(full_name, email, score_pct, cert_id)
+    cert_id = str(uuid.uuid4())
+    # One clock read per submission so the row, certificate and cert metadata agree
+    now = datetime.now()
+
+    # Build row for CSV + Sheets (header-aware writer will align)
+    row = {
+        "timestamp": now.isoformat(timespec="seconds"),
+        "full_name": S.full_name,
+        "email": S.email,
+
+        # Attendee demographics
+        "role": S.role,                         # credentials (RN/APRN/etc.)
+        "job_title": S.job_title,               # NEW
+        "institution_name": S.institution_name, # NEW
+        "attendance": "Yes" if S.attendance else "No",
+        "location_city": S.location_city,
+        "location_state": S.location_state,
+        "location_country": S.location_country,
+        "member_status": S.member_status,
+        "contact_opt_in": BOOL(S.contact_opt_in),
+
+        # Evaluation (Likert - text)
+        "ev_org": S.ev_org,
+        "ev_ad": S.ev_ad,
+        "ev_rel": S.ev_rel,
+        "ev_virt": S.ev_virt,
+        "ev_obj": S.ev_obj,
+        "lo_met": S.lo_met,
+
+        # Evaluation numeric mirrors (for averages); slider options are exactly LIKERT_MAP's keys
+        **{k: LIKERT_MAP[v] for k, v in (
+            ("ev_org_num", S.ev_org), ("ev_ad_num", S.ev_ad), ("ev_rel_num", S.ev_rel),
+            ("ev_virt_num", S.ev_virt), ("ev_obj_num", S.ev_obj),
+        )},
+
+        # Overall ratings
+        "overall_prog": S.overall_prog,
+        "overall_rec":  S.overall_rec,
+        "overall_zoom": S.overall_zoom,
+
+        # Free text
+        "beneficial_topic": S.beneficial_topic,
+        "topics_interest": one_line(S.topics_interest),
+        "comments": one_line(S.comments),
+
+        # Quiz summary
+        "quiz_score": correct,
+        "quiz_total": total,
+        "quiz_pct": f"{score_pct:.0f}",
+        "quiz_passed": BOOL(passed),
+
+        # Pass/Cert linkage
+        "score_pct": f"{score_pct:.0f}",
+        "passed": passed,
+        "cert_id": cert_id,
+    }
+
+    # Speaker ratings (1..5), already keyed by column name
+    row.update(speaker_ratings)
+
+    # Improvement + bias + practice change
+    row.update({
+        "improve_knowledge":   BOOL(S.improve_knowledge),
+        "improve_skills":      BOOL(S.improve_skills),
+        "improve_competence":  BOOL(S.improve_competence),
+        "improve_performance": BOOL(S.improve_performance),
+        "improve_outcomes":    BOOL(S.improve_outcomes),
+
+        "fair_balanced":       S.fair_balanced,
+        "commercial_support":  S.commercial_support,
+        "commercial_bias":     S.commercial_bias,
+        "bias_explain":        S.bias_explain,
+
+        "pc_values": BOOL(S.pc_values),
+        "pc_joy":    BOOL(S.pc_joy),
+        "pc_health": BOOL(S.pc_health),
+        "pc_other":  S.pc_other,
+    })
+
+    # CSV backup (optional) — written by the background worker so submit doesn't wait on disk
+    _background_queue().put((save_row_to_csv, (os.path.join(SAVE_DIR, "submissions.csv"), row)))
+
+    # Sheets writes run on the I/O pool while the certificate renders, so the download
+    # button is shown before they finish; the run still waits on them for the status messages
+    fut_eval = _io_pool().submit(save_eval_to_sheets, row)
+
+    if passed:
+        pdf_buffer = make_certificate_pdf(S.full_name, S.email, score_pct, cert_id, now.strftime("%Y-%m-%d %H:%M"))
 
         # Save certificate metadata to Google Sheets
         cert_row = {
             "cert_id": cert_id,
-            "name": full_name,
-            "email": email,
+            "name": S.full_name,
+            "email": S.email,
             "course_title": COURSE_TITLE,
             "course_date": COURSE_DATE,
             "credit_hours": CREDIT_HOURS,
+            "created_at": row["timestamp"],
         }
-        try:
-            save_cert_to_sheets(cert_row)
-        except Exception as e:
-            st.warning(f"Certificate recorded locally only (Sheets issue): {e}")
+        fut_cert = _io_pool().submit(save_cert_to_sheets, cert_row)
 
         st.success("🎉 Congratulations! You passed and your certificate is ready.")
         st.download_button(
             "⬇️ Download Certificate (PDF)",
-            data=pdf_bytes,
-            file_name=f"Certificate_{full_name.replace(' ', '_')}.pdf",
+            data=pdf_buffer,
+            file_name=f"Certificate_{S.full_name.replace(' ', '_')}.pdf",
             mime="application/pdf",
         )
+
+    try:
+        fut_eval.result()
+        st.success("Queued for Google Sheets ✅")
+    except Exception as e:
+        st.error(f"Could not save to Google Sheets (evaluations): {e}")
+
+    # If not passed, stop here
+    if not passed:
+        st.error("You did not reach the passing score. You may review content and retake the post-test.")
+        st.stop()
+
+    try:
+        fut_cert.result()
+    except Exception as e:
+        st.warning(f"Certificate recorded locally only (Sheets issue): {e}")
@@ -1,10 +1,10 @@
 # supabase_client.py
 import streamlit as st
-from supabase import create_client, Client
 
 @st.cache_resource(show_spinner=False)
-def get_supabase() -> Client:
+def get_supabase():
     """Return a cached Supabase client using credentials from secrets.toml"""
+    from supabase import create_client  # imported on first use; the client is cached per process
     url = st.secrets["supabase"]["url"]
     key = st.secrets["supabase"]["anon_key"]
     return create_client(url, key)